@@ -24,7 +24,7 @@ import logging
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 from langchain_core.embeddings import Embeddings
-from supabase import Client
+from postgrest import SyncPostgrestClient
 
 # Load environment variables
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../.env"))
@@ -33,14 +33,14 @@ logger = logging.getLogger(__name__)
 
 
 class SupabaseVectorDB:
-    def __init__(self, user_id: str, embedding_model: Embeddings, supabase_client: Client):
+    def __init__(self, user_id: str, embedding_model: Embeddings, supabase_client: SyncPostgrestClient):
         """
         Initialize the SupabaseVectorDB instance.
 
         Args:
             user_id (str): The UUID of the user (from auth.users)
             embedding_model (Embeddings): LangChain embeddings model
-            supabase_client (Client): Authenticated Supabase client with user's token
+            supabase_client (SyncPostgrestClient): Authenticated database client with user's token
         """
         self.user_id = user_id
         self.embedding_model = embedding_model
@@ -171,23 +171,6 @@ class SupabaseVectorDB:
             logger.error(f"Error fetching chunks for source {source_id}: {str(e)}")
             raise
 
-    def get_source_count(self, source_id: str) -> int:
-        """
-        Get the number of chunks stored for a source.
-
-        Args:
-            source_id (str): UUID of the source
-
-        Returns:
-            int: Number of chunks
-        """
-        try:
-            result = self.supabase.table('document_chunks').select('id', count='exact').eq('source_id', source_id).eq('user_id', self.user_id).execute()
-            return result.count or 0
-        except Exception as e:
-            logger.error(f"Error counting chunks for source {source_id}: {str(e)}")
-            return 0
-
 
 # -------------------- Testing Block --------------------
 
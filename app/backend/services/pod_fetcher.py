@@ -35,12 +35,21 @@ class PodFetcher:
     # Base URL for the new transcript scraping service
     _PODSCRIPTS_BASE_URL = "https://podscripts.co"
 
-    def __init__(self):
+    # (realpath, mtime) of browser/driver binaries that passed the --version probe, so a
+    # symlink and its target share one entry. Shared across instances since a PodFetcher
+    # is built per request.
+    _working_binaries = set()
+
+    def __init__(self, output_dir: str = None):
         """
         Initialize with target output directory and set up headless browser options.
         Automatically detects available browser (Chrome or Chromium) and configures accordingly.
+
+        Args:
+            output_dir (str, optional): Where downloads are written. Defaults to the
+                                        backend's downloads/ directory.
         """
-        self.output_dir = os.path.join(os.path.dirname(__file__), "..", "downloads")
+        self.output_dir = output_dir or os.path.join(os.path.dirname(__file__), "..", "downloads")
         # Ensure the output directory exists
         os.makedirs(self.output_dir, exist_ok=True)
 
@@ -55,13 +64,86 @@ class PodFetcher:
         if self.browser_binary:
             self.chrome_options.binary_location = self.browser_binary
 
+    @staticmethod
+    def _installed_binaries(paths: list) -> list:
+        """
+        Filter absolute candidate paths down to executable files, listing each
+        parent directory once instead of checking every path individually.
+
+        Returns:
+            list: (path, mtime) tuples for the installed candidates, in input order
+        """
+        import stat
+
+        entries_by_dir = {}
+        installed = []
+        for path in paths:
+            directory, name = os.path.split(path)
+            if directory not in entries_by_dir:
+                try:
+                    with os.scandir(directory) as it:
+                        entries_by_dir[directory] = {entry.name: entry for entry in it}
+                except OSError:
+                    entries_by_dir[directory] = {}
+            entry = entries_by_dir[directory].get(name)
+            if entry is None:
+                continue
+            # One stat (following symlinks to the real binary) answers existence, type,
+            # executability and the mtime used to cache probe results
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            # Skip stubs and non-executable files rather than forking them just to fail
+            if stat.S_ISREG(st.st_mode) and st.st_mode & 0o111:
+                installed.append((path, st.st_mtime))
+        return installed
+
+    @staticmethod
+    def _probe_version(candidate: tuple) -> bool:
+        """
+        Return True if running `path --version` succeeds for a (path, mtime) candidate.
+        Successful probes are remembered per (realpath, mtime), so the binary is only
+        run again after it is replaced or upgraded.
+        """
+        import subprocess
+
+        path, mtime = candidate
+        cache_key = (os.path.realpath(path), mtime)
+        if cache_key in PodFetcher._working_binaries:
+            return True
+
+        try:
+            # Only stdout is read; stderr goes straight to /dev/null instead of a pipe
+            subprocess.check_output([path, "--version"], stderr=subprocess.DEVNULL,
+                                    timeout=5, encoding="ascii", errors="replace")
+        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
+            return False
+        PodFetcher._working_binaries.add(cache_key)
+        return True
+
+    def _first_working_binary(self, paths: list) -> str:
+        """
+        Probe all installed candidates concurrently and return the first one, in
+        priority order, whose --version check succeeds. Returns None if none do.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        candidates = self._installed_binaries(paths)
+        if not candidates:
+            return None
+        with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+            results = list(executor.map(self._probe_version, candidates))
+        for (path, _), ok in zip(candidates, results):
+            if ok:
+                return path
+        return None
+
     def _detect_browser_binary(self) -> str:
         """
         Detect available browser binary and return its path.
         Returns None if no browser is found.
         """
-        import subprocess
-        
         # Check for Google Chrome first
         chrome_paths = [
             "/usr/bin/google-chrome-stable",
@@ -75,16 +157,11 @@ class PodFetcher:
             "/usr/bin/chromium-browser"
         ]
         
-        # Test all paths
-        for path in chrome_paths + chromium_paths:
-            try:
-                result = subprocess.run([path, "--version"], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    print(f"[PodFetcher] Found browser: {path}")
-                    return path
-            except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-                continue
+        # Test the paths that are actually installed
+        path = self._first_working_binary(chrome_paths + chromium_paths)
+        if path:
+            print(f"[PodFetcher] Found browser: {path}")
+            return path
         
         print("[PodFetcher] Warning: No browser binary found. Selenium may fail.")
         return None
@@ -93,24 +170,23 @@ class PodFetcher:
         """
         Detect available ChromeDriver and return its path.
         """
-        import subprocess
-        
+        import shutil
+
         # Check common ChromeDriver locations
         driver_paths = [
             "/usr/local/bin/chromedriver",  # Chrome ChromeDriver
             "/usr/bin/chromedriver",        # Chromium ChromeDriver
-            "chromedriver"                  # System PATH
         ]
+
+        # Resolve the System PATH entry once, skipping it if it is one of the above
+        resolved = shutil.which("chromedriver")
+        if resolved and os.path.realpath(resolved) not in {os.path.realpath(p) for p in driver_paths}:
+            driver_paths.append(resolved)
         
-        for path in driver_paths:
-            try:
-                result = subprocess.run([path, "--version"], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    print(f"[PodFetcher] Found ChromeDriver: {path}")
-                    return path
-            except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-                continue
+        path = self._first_working_binary(driver_paths)
+        if path:
+            print(f"[PodFetcher] Found ChromeDriver: {path}")
+            return path
         
         print("[PodFetcher] Warning: No ChromeDriver found. Using default.")
         return None
@@ -0,0 +1,58 @@
+"""
+result_cache.py
+
+Provides the ResultCache class, a small in-process LRU cache for expensive
+pipeline results (transcriptions and summaries).
+
+Entries are keyed by content identity (YouTube video ID, podcast URL, hash of
+uploaded audio or transcript) rather than by user, so the same video pasted
+by different users is only downloaded, transcribed and summarized once.
+Per-user data (sources rows, vector chunks) is never cached here.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class ResultCache:
+    """Thread-safe, size-bounded LRU cache."""
+
+    def __init__(self, max_entries: int = 128):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept before the least
+                               recently used one is evicted.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if it is not cached.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store value under key, evicting the least recently used entry if full.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def content_key(prefix: str, content) -> str:
+        """
+        Build a cache key from the SHA-256 of content (str or bytes).
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return f"{prefix}:{hashlib.sha256(content).hexdigest()}"
@@ -2,7 +2,13 @@
 Supabase client for database operations
 """
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from jose import jwt, JWTError
 from supabase import create_client, Client
+from postgrest import SyncPostgrestClient
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -21,10 +27,67 @@ if SUPABASE_SERVICE_KEY:
 else:
     raise ValueError("SUPABASE_SERVICE_KEY must be set in .env file")
 
-def get_user_supabase_client(access_token: str) -> Client:
+# Clients are cached per token so repeated requests from the same session reuse one
+# client and its HTTP connection pool. Entries are keyed by a hash of the token (the raw
+# bearer token is not kept as a key) and expire with the token. Expired or evicted
+# clients are only dropped from the cache, never closed, since a running request may
+# still hold one; their connection pools are released once they are garbage-collected.
+USER_CLIENT_CACHE_SIZE = int(os.getenv("USER_CLIENT_CACHE_SIZE", "512"))
+# Lifetime for tokens without a readable exp claim
+USER_CLIENT_DEFAULT_TTL = 300  # seconds
+
+_user_clients = OrderedDict()  # token hash -> (client, expires_at)
+_user_clients_lock = threading.Lock()
+
+def _token_expiry(access_token: str) -> float:
+    """Return the token's exp claim, or a short default lifetime if it has none"""
+    try:
+        exp = jwt.get_unverified_claims(access_token).get("exp")
+    except JWTError:
+        exp = None
+    return float(exp) if exp else time.time() + USER_CLIENT_DEFAULT_TTL
+
+def get_user_supabase_client(access_token: str) -> SyncPostgrestClient:
+    """
+    Get a database client with the user's JWT token, reusing a cached one until the
+    token expires. This client will respect RLS policies and auth.uid() will be set correctly.
+    """
+    key = hashlib.sha256(access_token.encode()).hexdigest()
+    now = time.time()
+    with _user_clients_lock:
+        entry = _user_clients.get(key)
+        if entry and entry[1] > now:
+            _user_clients.move_to_end(key)
+            return entry[0]
+
+    client = _create_user_client(access_token)
+    expires_at = _token_expiry(access_token)
+    if expires_at <= now:
+        # Nothing to reuse for a token that is already expired
+        return client
+
+    with _user_clients_lock:
+        # Another request may have cached a client for this token while we built ours
+        entry = _user_clients.get(key)
+        if entry and entry[1] > now:
+            _user_clients.move_to_end(key)
+            return entry[0]
+        _user_clients[key] = (client, expires_at)
+        _user_clients.move_to_end(key)
+        # Drop clients whose tokens have expired
+        for cached_key, (_, cached_expires_at) in list(_user_clients.items()):
+            if cached_expires_at <= now:
+                del _user_clients[cached_key]
+        while len(_user_clients) > USER_CLIENT_CACHE_SIZE:
+            _user_clients.popitem(last=False)
+    return client
+
+def _create_user_client(access_token: str) -> SyncPostgrestClient:
     """
-    Create a Supabase client with the user's JWT token.
-    This client will respect RLS policies and auth.uid() will be set correctly.
+    Create a database client with the user's JWT token.
+
+    Only the PostgREST client is built: user requests only run table/rpc queries,
+    so the auth, storage and realtime clients a full Supabase client sets up are skipped.
     """
     import logging
     logger = logging.getLogger(__name__)
@@ -33,17 +96,43 @@ def get_user_supabase_client(access_token: str) -> Client:
         # If SUPABASE_ANON_KEY is not set, use service key but set the JWT token
         # This allows RLS policies to work with auth.uid()
         logger.warning("SUPABASE_ANON_KEY not set. Using service key with user JWT token.")
-        client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-        # Set the JWT token in the Authorization header for RLS to work
-        client.postgrest.auth(access_token)
-        return client
+        api_key = SUPABASE_SERVICE_KEY
+    else:
+        # Use the anon key (preferred method)
+        api_key = SUPABASE_ANON_KEY
 
-    # Create client with anon key (preferred method)
-    client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+    client = SyncPostgrestClient(f"{SUPABASE_URL}/rest/v1", headers={"apikey": api_key})
 
-    # Set the access token using the postgrest client's auth method
+    # Set the user's access token as the Authorization bearer
     # This ensures RLS policies can access auth.uid() correctly
-    # The postgrest client is what handles the database queries
-    client.postgrest.auth(access_token)
+    client.auth(access_token)
 
     return client
+
+# -------------------- Testing Block --------------------
+
+if __name__ == "__main__":
+    from unittest import mock
+
+    # Two concurrent cache misses for the same token must share one client
+    barrier = threading.Barrier(2)
+
+    def slow_create(access_token):
+        barrier.wait()
+        return mock.Mock()
+
+    results = []
+    with mock.patch(f"{__name__}._create_user_client", side_effect=slow_create):
+        threads = [
+            threading.Thread(target=lambda: results.append(get_user_supabase_client("test-token")))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert results[0] is results[1], "concurrent misses returned different clients"
+    for result in results:
+        result.session.close.assert_not_called()
+    print("Concurrent cache misses share one client")
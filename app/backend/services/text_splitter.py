@@ -6,60 +6,112 @@ This module defines the TextSplitter class.
 Current functionality:
   - Takes a file path to a text file.
   - Reads the contents of the text file.
-  - Splits the text into chunks using LangChain's RecursiveCharacterTextSplitter.
+  - Splits the text into chunks at separator boundaries found by a single
+    precompiled regex scan, preferring higher-priority separators
+    (paragraphs, lines, sentences, clauses, words).
   - Returns a list of raw string chunks.
 
 Future enhancements:
   - Add support for other file types (e.g., PDF, DOCX) by subclassing or adding new methods.
 """
 # %%
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import mmap
+import os
+import re
+from bisect import bisect_left, bisect_right
+
+# Separators in priority order. Each alternative is its own capture group so the
+# group index of a match doubles as its rank (1 = most preferred split point).
+# Every separator starts with whitespace; the leading lookahead lets the scan
+# reject all other positions before trying the alternatives.
+DEFAULT_SEPARATOR_PATTERN = (
+    r"(?=\s)(?:"
+    r"(\n{2,})"            # paragraph break
+    r"|(\n)"               # line break
+    r"|((?<=[.!?])\s+)"    # end of sentence
+    r"|((?<=[;,])\s+)"     # clause
+    r"|(\s+)"              # word
+    r")"
+)
+SPLIT_RE = re.compile(DEFAULT_SEPARATOR_PATTERN)
+# Matches nothing: with no usable separators every chunk boundary is a hard cut.
+NO_SPLIT_PATTERN = r"(?!)"
+# Same separators over raw bytes, used to split files without decoding them whole.
+BYTE_SPLIT_RE = re.compile(DEFAULT_SEPARATOR_PATTERN.encode())
+
 
 class TextSplitter:
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50, separators: list = None):
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50, separators: list = None,
+                 use_langchain: bool = False):
         """
         Initialize the TextSplitter with configurable chunk parameters.
 
         Args:
             chunk_size (int): Maximum number of characters per chunk.
             chunk_overlap (int): Number of overlapping characters between consecutive chunks.
-            separators (list, optional): Custom separators for splitting text.
-                                         If None, the default separators in RecursiveCharacterTextSplitter are used.
+            separators (list, optional): Custom literal separators for splitting text, in priority order.
+                                         If None, paragraph, line, sentence, clause and word
+                                         boundaries are used. An empty string means "cut anywhere",
+                                         which is always the last resort anyway.
+            use_langchain (bool): Split with LangChain's RecursiveCharacterTextSplitter instead,
+                                  for output identical to earlier versions of this class.
         """
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.separators = separators
-        
-        # Initialize the recursive text splitter from LangChain.
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            separators=self.separators
-        )
+
+        self.langchain_splitter = None
+        if use_langchain:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            self.langchain_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                separators=self.separators
+            )
+
+        # Compile all separators into one alternation so split points are found in a single pass.
+        if separators:
+            pattern = "|".join(f"({re.escape(sep)})" for sep in separators if sep) or NO_SPLIT_PATTERN
+            self.split_re = re.compile(pattern)
+            self.byte_split_re = re.compile(pattern.encode())
+        else:
+            self.split_re = SPLIT_RE
+            self.byte_split_re = BYTE_SPLIT_RE
 
     def split_file(self, file_path: str) -> list:
         """
         Reads a text file from the given file path and splits it into chunks.
 
+        The file is split as UTF-8 bytes straight from the memory map and only the
+        emitted chunks are decoded, so chunk_size and chunk_overlap count bytes here.
+
         Args:
             file_path (str): Path to the text file.
 
         Returns:
             List[str]: A list of raw string chunks.
         """
-        # Load the text from the file.
-        with open(file_path, "r", encoding="utf-8") as f:
-            text = f.read()
+        if self.langchain_splitter:
+            with open(file_path, "r", encoding="utf-8") as f:
+                return self.split_text(f.read())
 
-        # Split the text into chunks.
-        chunks = self.splitter.split_text(text)
-        
-        # Optionally, filter out any empty chunks.
-        return [chunk for chunk in chunks if chunk.strip()]
+        # Map the file instead of reading it so the kernel page cache backs the buffer.
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                chunks = (
+                    str(mm[start:end], "utf-8", "replace").strip()
+                    for start, end in self._chunk_spans(mm, self.byte_split_re)
+                )
+                return [chunk for chunk in chunks if chunk]
 
     def split_text(self, text: str) -> list:
         """
-        Splits a raw text string into chunks using the recursive text splitter.
+        Splits a raw text string into chunks at the best available separator boundaries.
 
         Args:
             text (str): The raw text to split.
@@ -67,9 +119,83 @@ class TextSplitter:
         Returns:
             List[str]: A list of string chunks.
         """
-        chunks = self.splitter.split_text(text)
-        return [chunk for chunk in chunks if chunk.strip()]
+        if self.langchain_splitter:
+            chunks = self.langchain_splitter.split_text(text)
+            return [chunk for chunk in chunks if chunk.strip()]
+
+        chunks = (text[start:end].strip() for start, end in self._chunk_spans(text, self.split_re))
+        return [chunk for chunk in chunks if chunk]
+
+    def _chunk_spans(self, text, split_re):
+        """
+        Yield (start, end) offsets of consecutive chunks of a str or UTF-8 buffer.
 
+        Every separator match is a candidate split point ranked by its group index.
+        Each chunk ends at the best-ranked split point in the second half of its
+        window (or the last split point if there is none), and the next chunk starts
+        at the earliest split point within chunk_overlap of that end. Chunks that had
+        to be hard-cut, or have no split point in the overlap window, overlap by a
+        plain chunk_overlap instead.
+
+        Split points are kept in sorted offset arrays (one overall, one per rank), so
+        each chunk boundary is found with a few bisects instead of walking every
+        separator in the window.
+        """
+        length = len(text)
+        if length <= self.chunk_size:
+            # Fits in a single chunk, no need to scan for separators at all
+            if length:
+                yield 0, length
+            return
+
+        ends = []
+        ends_by_rank = [[] for _ in range(split_re.groups)]
+        for match in split_re.finditer(text):
+            ends.append(match.end())
+            ends_by_rank[match.lastindex - 1].append(match.end())
+
+        start = 0
+        while start < length:
+            limit = start + self.chunk_size
+            if limit >= length:
+                yield start, length
+                return
+
+            end = None
+            hard_cut = False
+            floor = max(start + self.chunk_size // 2, start + 1)
+            for rank_ends in ends_by_rank:
+                # Furthest split point of this rank that still fits in the window
+                i = bisect_right(rank_ends, limit) - 1
+                if i >= 0 and rank_ends[i] >= floor:
+                    end = rank_ends[i]
+                    break
+
+            if end is None:
+                i = bisect_right(ends, limit) - 1
+                if i >= 0 and ends[i] > start:
+                    end = ends[i]
+                else:
+                    end = limit
+                    hard_cut = True
+                    if not isinstance(text, str):
+                        # Never hard-cut a buffer inside a multi-byte UTF-8 sequence.
+                        while end > start + 1 and text[end] & 0xC0 == 0x80:
+                            end -= 1
+            yield start, end
+
+            # Step back to the earliest split point inside the overlap window.
+            # (never at or before the current start, so the chunk still moves forward)
+            overlap_start = max(end - self.chunk_overlap, start + 1)
+            i = bisect_left(ends, overlap_start)
+            if not hard_cut and i < len(ends) and ends[i] < end:
+                start = ends[i]
+            else:
+                start = overlap_start
+                if not isinstance(text, str):
+                    # Start on a UTF-8 character boundary, as the hard cut does.
+                    while start < end and text[start] & 0xC0 == 0x80:
+                        start += 1
 
 # %%
 # Example usage for testing the module:
@@ -84,5 +210,22 @@ if __name__ == "__main__":
     chunks = splitter.split_file(sample_file_path)
     
     print(f"Split the file into {len(chunks)} chunks.")
+
+    # Text without any separators is hard-cut, but consecutive chunks still overlap.
+    # The byte path must do the same without splitting multi-byte characters.
+    import tempfile
+    for text in ("x" * 1234, "\u6f22\u5b57" * 617):
+        for kwargs in ({}, {"separators": [""]}):
+            no_sep_splitter = TextSplitter(chunk_size=500, chunk_overlap=50, **kwargs)
+            no_sep_chunks = no_sep_splitter.split_text(text)
+            assert "".join(c[50:] if i else c for i, c in enumerate(no_sep_chunks)) == text
+            assert all(a[-50:] == b[:50] for a, b in zip(no_sep_chunks, no_sep_chunks[1:]))
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt", delete=False) as f:
+            f.write(text)
+        byte_chunks = TextSplitter(chunk_size=500, chunk_overlap=50).split_file(f.name)
+        os.remove(f.name)
+        assert len(byte_chunks) > 1
+        assert all(b.encode()[:48] in a.encode() for a, b in zip(byte_chunks, byte_chunks[1:]))
+    print("Hard-cut chunks overlap by chunk_overlap.")
     for i, chunk in enumerate(chunks):
         print(f"\nCHUNK {i+1}:\n{chunk}")
@@ -9,6 +9,7 @@ Strategy:
 2. Only download audio and transcribe if no transcript exists
 """
 
+import asyncio
 import logging
 import re
 from typing import Optional, Dict
@@ -21,6 +22,15 @@ from youtube_transcript_api._errors import (
 
 logger = logging.getLogger(__name__)
 
+# Transcript languages we accept, in order of preference
+_PREFERRED_LANGUAGES = ['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh-Hans', 'zh-Hant']
+_LANGUAGE_RANK = {code: rank for rank, code in enumerate(_PREFERRED_LANGUAGES)}
+
+# Single pattern covering watch (v= in any query position), youtu.be, embed and v/ URLs
+_YOUTUBE_VIDEO_ID_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|v/)|youtu\.be/)([a-zA-Z0-9_-]{11})'
+)
+
 
 class TranscriptFetcher:
     """Fetches transcripts from various sources, preferring existing text over audio transcription"""
@@ -36,16 +46,8 @@ class TranscriptFetcher:
         - https://www.youtube.com/embed/VIDEO_ID
         - https://www.youtube.com/v/VIDEO_ID
         """
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/|youtube\.com\/v\/)([a-zA-Z0-9_-]{11})',
-            r'youtube\.com\/watch\?.*v=([a-zA-Z0-9_-]{11})',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+        match = _YOUTUBE_VIDEO_ID_RE.search(url)
+        return match.group(1) if match else None
 
     @staticmethod
     def get_youtube_transcript(url: str) -> Optional[Dict[str, str]]:
@@ -57,55 +59,77 @@ class TranscriptFetcher:
         """
         video_id = TranscriptFetcher.extract_youtube_video_id(url)
         if not video_id:
-            logger.warning(f"Could not extract video ID from URL: {url}")
+            logger.warning("Could not extract video ID from URL: %s", url)
             return None
 
         try:
-            logger.info(f"Attempting to fetch YouTube transcript for video ID: {video_id}")
+            logger.info("Attempting to fetch YouTube transcript for video ID: %s", video_id)
 
             # Try to get transcript in English first, then any available language
             transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
 
-            # Prefer manually created transcripts over auto-generated
-            try:
-                transcript = transcript_list.find_manually_created_transcript(['en'])
-                logger.info(f"Found manual English transcript for {video_id}")
+            # Rank every available transcript in a single pass: language preference
+            # first, then manually created before auto-generated
+            transcript = None
+            best_rank = None
+            for candidate in transcript_list:
+                language_rank = _LANGUAGE_RANK.get(candidate.language_code)
+                if language_rank is None:
+                    continue
+                rank = (language_rank, candidate.is_generated)
+                if best_rank is None or rank < best_rank:
+                    transcript = candidate
+                    best_rank = rank
+                    if rank == (0, False):
+                        break  # Manual English transcript, nothing ranks higher
+
+            if transcript is None:
+                logger.info("No transcript found for video %s", video_id)
+                return None
+
+            if transcript.language_code == 'en' and not transcript.is_generated:
+                logger.info("Found manual English transcript for %s", video_id)
                 source = "youtube_manual_transcript"
-            except:
-                # Fall back to auto-generated
-                try:
-                    transcript = transcript_list.find_generated_transcript(['en'])
-                    logger.info(f"Found auto-generated English transcript for {video_id}")
-                    source = "youtube_auto_transcript"
-                except:
-                    # Try any available language
-                    transcript = transcript_list.find_transcript(['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh-Hans', 'zh-Hant'])
-                    logger.info(f"Found transcript in language: {transcript.language_code}")
-                    source = f"youtube_transcript_{transcript.language_code}"
+            elif transcript.language_code == 'en':
+                logger.info("Found auto-generated English transcript for %s", video_id)
+                source = "youtube_auto_transcript"
+            else:
+                logger.info("Found transcript in language: %s", transcript.language_code)
+                source = f"youtube_transcript_{transcript.language_code}"
 
             # Fetch and format the transcript
             transcript_data = transcript.fetch()
-            full_text = " ".join([entry['text'] for entry in transcript_data])
+            full_text = " ".join(entry['text'] for entry in transcript_data)
 
-            logger.info(f"Successfully fetched YouTube transcript ({len(full_text)} characters)")
+            logger.info("Successfully fetched YouTube transcript (%d characters)", len(full_text))
             return {
                 'transcript': full_text,
                 'source': source
             }
 
         except TranscriptsDisabled:
-            logger.info(f"Transcripts are disabled for video {video_id}")
+            logger.info("Transcripts are disabled for video %s", video_id)
             return None
         except NoTranscriptFound:
-            logger.info(f"No transcript found for video {video_id}")
+            logger.info("No transcript found for video %s", video_id)
             return None
         except VideoUnavailable:
-            logger.warning(f"Video {video_id} is unavailable")
+            logger.warning("Video %s is unavailable", video_id)
             return None
         except Exception as e:
-            logger.error(f"Error fetching YouTube transcript: {str(e)}")
+            logger.error("Error fetching YouTube transcript: %s", e)
             return None
 
+    @staticmethod
+    async def get_youtube_transcript_async(url: str) -> Optional[Dict[str, str]]:
+        """
+        Async variant of get_youtube_transcript.
+
+        Runs the blocking youtube-transcript-api calls in a worker thread so the
+        network wait does not hold up the event loop.
+        """
+        return await asyncio.to_thread(TranscriptFetcher.get_youtube_transcript, url)
+
     @staticmethod
     def get_podcast_transcript(url: str, rss_data: Optional[Dict] = None) -> Optional[Dict[str, str]]:
         """
@@ -124,5 +148,5 @@ class TranscriptFetcher:
         # - Episode description for transcript links
         # - Third-party transcript services (podscripts.co, etc.)
 
-        logger.info(f"Podcast transcript fetching not yet implemented for: {url}")
+        logger.info("Podcast transcript fetching not yet implemented for: %s", url)
         return None
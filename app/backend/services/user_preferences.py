@@ -7,11 +7,14 @@ from typing import Optional, Dict
 from supabase import Client
 from .supabase_client import get_user_supabase_client
 
-# Available models that users can select (fixed list)
-AVAILABLE_MODELS = [
+# Available models that users can select (fixed set, for O(1) membership checks)
+AVAILABLE_MODELS = frozenset({
     "gemma3:1b",     # Small, fast model (~815MB)
     "qwen3:1.7b",    # Slightly larger, good balance (~1.3GB)
-]
+})
+
+# Stable ordering of AVAILABLE_MODELS for user-facing messages
+_AVAILABLE_MODELS_SORTED = tuple(sorted(AVAILABLE_MODELS))
 
 DEFAULT_MODEL = "gemma3:1b"
 
@@ -83,24 +86,15 @@ class UserPreferencesService:
         """
         # Validate model
         if preferred_model not in AVAILABLE_MODELS:
-            raise ValueError(f"Invalid model '{preferred_model}'. Must be one of: {', '.join(AVAILABLE_MODELS)}")
+            raise ValueError(f"Invalid model '{preferred_model}'. Must be one of: {', '.join(_AVAILABLE_MODELS_SORTED)}")
 
         client = get_user_supabase_client(access_token)
 
-        # Check if preferences exist
-        check_response = client.table('user_preferences').select('user_id').eq('user_id', user_id).execute()
-
-        if check_response.data and len(check_response.data) > 0:
-            # Update existing preferences
-            response = client.table('user_preferences').update({
-                "preferred_model": preferred_model
-            }).eq('user_id', user_id).execute()
-        else:
-            # Insert new preferences
-            response = client.table('user_preferences').insert({
-                "user_id": user_id,
-                "preferred_model": preferred_model
-            }).execute()
+        # Insert or update in a single round-trip (user_id is the primary key)
+        response = client.table('user_preferences').upsert({
+            "user_id": user_id,
+            "preferred_model": preferred_model
+        }, on_conflict='user_id').execute()
 
         if response.data and len(response.data) > 0:
             return {